@@ -1,151 +1,294 @@
 import google.generativeai as genai
-import json
+from google.api_core import exceptions as google_exceptions
+import asyncio
 import logging
+import orjson
+import re
 import time
 from typing import Dict, Any
 from datetime import datetime, timezone
+from llm_cache import LLMCache
 
 logger = logging.getLogger(__name__)
 
-class GeminiAnalysisAgent:
-    """Unified Gemini agent for disaster analysis"""
-    
-    def __init__(self, api_key: str):
-        genai.configure(api_key=api_key)
-        # Using latest available Gemini models
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
-        self.pro_model = genai.GenerativeModel('gemini-2.5-pro')
-        
-        # Analysis prompt template
-        self.analysis_prompt = """
-You are an expert disaster management AI assistant. Analyze the following content for emergency response purposes.
-
-CONTENT:
-{content}
-
-PUBLISHED: {timestamp}
-SOURCE: {source}
-
-Analyze and provide a JSON response with:
+# Errors worth retrying; anything else fails the same way on every model
+_TRANSIENT_ERRORS = (
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+    asyncio.TimeoutError
+)
 
-1. RELEVANCE: Is this disaster/emergency related? (0.0-1.0 score)
-2. LOCATIONS: Extract all mentioned locations with estimated coordinates
-3. URGENCY: Rate urgency 1-10 considering:
-   - Life-threatening situations (9-10)
-   - Major property/infrastructure damage (7-8)
-   - General distress (4-6)
-   - Informational (1-3)
-4. SENTIMENT: Analyze emotional state and distress level
-5. VERIFICATION: Assess credibility (0.0-1.0)
-6. INCIDENT_TYPE: Categorize (flood, fire, earthquake, etc.)
-7. KEY_DETAILS: Extract critical information
+# Circuit breaker: after this many consecutive transient failures, skip
+# Gemini and use keyword-only analysis for the cool-down period
+_FAILURE_THRESHOLD = 5
+_COOLDOWN_SECONDS = 60
 
-Response format (valid JSON only):
-{
-  "relevance_score": 0.0-1.0,
-  "urgency_score": 1-10,
-  "credibility_score": 0.0-1.0,
-  "locations": [
-    {"name": "", "latitude": 0.0, "longitude": 0.0, "confidence": 0.0}
-  ],
-  "sentiment": {
-    "distress_level": "low|medium|high|critical",
-    "emotions": ["fear", "panic"],
-    "help_seeking": true/false
-  },
-  "incident_type": "flood|fire|earthquake|landslide|storm|other",
-  "severity": "low|moderate|severe|critical",
-  "key_details": "Brief summary",
-  "affected_population": "estimation",
-  "immediate_actions": ["action1", "action2"],
-  "reasoning": "Brief explanation"
-}
-"""
-    
-    async def analyze_content(self, content: str, source: str, timestamp: str, use_pro: bool = False) -> Dict[str, Any]:
-        """Analyze content using Gemini with JSON mode"""
-        try:
-            start_time = time.time()
-            
-            # Choose model based on complexity
-            model = self.pro_model if use_pro else self.model
-            
-            # Simplified prompt for JSON mode
-            prompt = f"""
-Analyze this emergency/disaster content and return ONLY valid JSON (no markdown, no explanations):
+# Keyword tables for the fallback analysis
+_DISASTER_KEYWORDS = frozenset([
+    "flood", "fire", "earthquake", "storm", "hurricane", "tornado",
+    "landslide", "emergency", "disaster", "evacuation", "rescue"
+])
+_URGENCY_KEYWORDS = frozenset([
+    "urgent", "critical", "emergency", "help", "rescue", "evacuate",
+    "danger", "life-threatening", "immediate"
+])
+_INCIDENT_TYPE_KEYWORDS = ("flood", "fire", "earthquake", "storm")
 
-CONTENT: {content}
-SOURCE: {source}
-TIME: {timestamp}
+# Finds every keyword in one pass; the lookahead lets matches overlap
+_FALLBACK_KEYWORDS_RE = re.compile("(?=(%s))" % "|".join(
+    re.escape(keyword)
+    for keyword in sorted(_DISASTER_KEYWORDS | _URGENCY_KEYWORDS, key=len, reverse=True)
+))
 
+# Fixed part of the analysis prompt: output schema and scoring guidelines
+_ANALYSIS_PROMPT_TAIL = """
 Return a JSON object with these exact fields:
-{{
+{
   "relevance_score": <number 0.0-1.0>,
   "urgency_score": <integer 1-10>,
   "credibility_score": <number 0.0-1.0>,
   "locations": [
-    {{"name": "<string>", "latitude": <number or null>, "longitude": <number or null>, "confidence": <number>}}
+    {"name": "<string>", "latitude": <number or null>, "longitude": <number or null>, "confidence": <number>}
   ],
-  "sentiment": {{
+  "sentiment": {
     "distress_level": "<low|medium|high|critical>",
     "emotions": ["<string>", ...],
     "help_seeking": <true or false>
-  }},
+  },
   "incident_type": "<flood|fire|earthquake|landslide|storm|other>",
   "severity": "<low|moderate|severe|critical>",
   "key_details": "<string>",
   "affected_population": "<string>",
   "immediate_actions": ["<string>", ...],
   "reasoning": "<string>"
-}}
+}
 
 Scoring guidelines:
 - relevance_score: How disaster/emergency related? (0.0-1.0)
 - urgency_score: Life-threatening=9-10, Major damage=7-8, General distress=4-6, Info=1-3
 - credibility_score: Source reliability (0.0-1.0)
 """
+
+# Response schemas enforced by Gemini's structured output mode
+_ANALYSIS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "relevance_score": {"type": "NUMBER"},
+        "urgency_score": {"type": "INTEGER"},
+        "credibility_score": {"type": "NUMBER"},
+        "locations": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "name": {"type": "STRING"},
+                    "latitude": {"type": "NUMBER", "nullable": True},
+                    "longitude": {"type": "NUMBER", "nullable": True},
+                    "confidence": {"type": "NUMBER"}
+                },
+                "required": ["name"]
+            }
+        },
+        "sentiment": {
+            "type": "OBJECT",
+            "properties": {
+                "distress_level": {"type": "STRING", "format": "enum", "enum": ["low", "medium", "high", "critical"]},
+                "emotions": {"type": "ARRAY", "items": {"type": "STRING"}},
+                "help_seeking": {"type": "BOOLEAN"}
+            }
+        },
+        "incident_type": {
+            "type": "STRING",
+            "format": "enum",
+            "enum": ["flood", "fire", "earthquake", "landslide", "storm", "other"]
+        },
+        "severity": {"type": "STRING", "format": "enum", "enum": ["low", "moderate", "severe", "critical"]},
+        "key_details": {"type": "STRING"},
+        "affected_population": {"type": "STRING"},
+        "immediate_actions": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "reasoning": {"type": "STRING"}
+    },
+    "required": ["relevance_score", "urgency_score", "credibility_score", "incident_type", "severity"]
+}
+
+_ALERT_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "public_message": {"type": "STRING"},
+        "emergency_message": {"type": "STRING"}
+    },
+    "required": ["public_message", "emergency_message"]
+}
+
+class GeminiAnalysisAgent:
+    """Unified Gemini agent for disaster analysis"""
+    
+    def __init__(self, api_key: str):
+        genai.configure(api_key=api_key)
+        # Using latest available Gemini models
+        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        self.pro_model = genai.GenerativeModel('gemini-2.5-pro')
+        
+        # Deterministic, schema-constrained JSON output so identical inputs
+        # give identical responses and parsing never has to repair the text
+        self.analysis_config = genai.types.GenerationConfig(
+            temperature=0.0,
+            response_mime_type="application/json",
+            response_schema=_ANALYSIS_SCHEMA
+        )
+        self.alert_config = genai.types.GenerationConfig(
+            temperature=0.0,
+            response_mime_type="application/json",
+            response_schema=_ALERT_SCHEMA
+        )
+        
+        # Cache of recent responses, e.g. entries a feed serves again
+        self.cache = LLMCache(maxsize=1024, ttl=3600)
+        
+        # Circuit breaker state
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+    
+    @property
+    def degraded(self) -> bool:
+        """True while the circuit breaker is open or half-open"""
+        return self._consecutive_failures >= _FAILURE_THRESHOLD
+    
+    def _allow_request(self) -> bool:
+        """Whether a call may go to Gemini; after the cool-down only one probe is let through"""
+        if not self.degraded:
+            return True
+        if time.time() < self._open_until:
+            return False
+        
+        # Half-open: this caller probes while everyone else keeps using the
+        # fallback. The probe also holds the breaker open for another
+        # cool-down, so a probe that ends without a result cannot wedge it
+        self._open_until = time.time() + _COOLDOWN_SECONDS
+        logger.info("Gemini circuit half-open, probing")
+        return True
+    
+    def _record_success(self):
+        """Close the circuit breaker after a successful Gemini call"""
+        if self.degraded:
+            logger.info("Gemini circuit closed after successful probe")
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+    
+    def _record_failure(self):
+        """Count a transient Gemini failure, opening the breaker past the threshold"""
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= _FAILURE_THRESHOLD:
+            self._open_until = time.time() + _COOLDOWN_SECONDS
+            logger.warning(f"Gemini circuit open for {_COOLDOWN_SECONDS}s after {self._consecutive_failures} failures")
+    
+    async def analyze_content(self, content: str, source: str, timestamp: str, use_pro: bool = False) -> Dict[str, Any]:
+        """Analyze content using Gemini with JSON mode"""
+        try:
+            start_time = time.time()
+            
+            # Choose model based on complexity
+            model = self.pro_model if use_pro else self.model
+            model_name = "gemini-2.5-pro" if use_pro else "gemini-2.5-flash"
+            
+            # Serve repeated content from cache. The key covers every prompt
+            # input, since credibility is scored from the source
+            cache_key = self.cache.make_key(model_name, {
+                "task": "analysis",
+                "content": self._normalize_content(content),
+                "source": source,
+                "timestamp": timestamp
+            })
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                cached.update({
+                    "processing_time_ms": int((time.time() - start_time) * 1000),
+                    "processed_at": datetime.now(timezone.utc)
+                })
+                logger.info("Content analysis served from cache")
+                return cached
+            
+            if not self._allow_request():
+                return self._create_fallback_analysis(content)
             
-            # Generate response with JSON mode (no Pydantic schema)
-            response = model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    response_mime_type="application/json"
-                )
+            # Only the content-specific header changes between calls
+            prompt = (
+                "\nAnalyze this emergency/disaster content and return ONLY valid JSON (no markdown, no explanations):\n\n"
+                f"CONTENT: {content}\nSOURCE: {source}\nTIME: {timestamp}\n"
+                + _ANALYSIS_PROMPT_TAIL
             )
             
+            # Generate response with structured JSON output
+            response = await model.generate_content_async(prompt, generation_config=self.analysis_config)
+            
             if not response or not response.text:
                 raise Exception("Empty response from Gemini")
             
-            # Parse JSON response (guaranteed valid JSON from JSON mode)
-            analysis = json.loads(response.text)
+            self._record_success()
+            
+            # Parse JSON response
+            analysis = self._parse_json_response(response.text)
             
             # Validate and clean analysis
             analysis = self._validate_analysis(analysis)
+            analysis["gemini_model"] = model_name
+            self.cache.set(cache_key, analysis)
             
             # Add metadata
             processing_time = int((time.time() - start_time) * 1000)
             analysis.update({
                 "processing_time_ms": processing_time,
-                "gemini_model": "gemini-2.5-pro" if use_pro else "gemini-2.5-flash",
                 "processed_at": datetime.now(timezone.utc)
             })
             
             logger.info(f"Content analysis completed in {processing_time}ms")
             return analysis
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
+            # Both models share the schema, so a retry would not help
             logger.error(f"JSON parsing error: {e}")
             return self._create_fallback_analysis(content)
             
-        except Exception as e:
+        except _TRANSIENT_ERRORS as e:
             logger.error(f"Gemini analysis error: {e}")
+            self._record_failure()
             
-            # Retry with Pro model if Flash failed
-            if not use_pro:
+            # Retry with Pro model if Flash failed, backing off on rate limits
+            if not use_pro and not self.degraded:
+                if isinstance(e, google_exceptions.ResourceExhausted):
+                    await asyncio.sleep(min(60, 2 ** self._consecutive_failures))
                 logger.info("Retrying with Gemini Pro...")
                 return await self.analyze_content(content, source, timestamp, use_pro=True)
             
             return self._create_fallback_analysis(content)
+            
+        except Exception as e:
+            logger.error(f"Gemini analysis error: {e}")
+            return self._create_fallback_analysis(content)
+    
+    def _parse_json_response(self, text: str) -> Any:
+        """Parse model output, tolerating a markdown fence or prose around the JSON"""
+        text = text.strip()
+        if text.startswith("```"):
+            # Drop the opening fence line, e.g. ```json
+            text = text.split("\n", 1)[1] if "\n" in text else text[3:]
+        if text.endswith("```"):
+            text = text[:-3]
+        
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            # Recover an object wrapped in surrounding prose
+            start, end = text.find('{'), text.rfind('}')
+            if start != -1 and end > start:
+                return orjson.loads(text[start:end + 1])
+            raise
+    
+    def _normalize_content(self, content: str) -> str:
+        """Normalize case and whitespace so trivially different copies share a cache entry"""
+        return " ".join(content.lower().split())
     
     def _validate_analysis(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
         """Validate and clean analysis results"""
@@ -184,28 +327,14 @@ Scoring guidelines:
     def _create_fallback_analysis(self, content: str) -> Dict[str, Any]:
         """Create fallback analysis when Gemini fails"""
         # Basic keyword-based analysis
-        disaster_keywords = [
-            "flood", "fire", "earthquake", "storm", "hurricane", "tornado",
-            "landslide", "emergency", "disaster", "evacuation", "rescue"
-        ]
-        
-        urgency_keywords = [
-            "urgent", "critical", "emergency", "help", "rescue", "evacuate",
-            "danger", "life-threatening", "immediate"
-        ]
-        
-        content_lower = content.lower()
+        found = {match.group(1) for match in _FALLBACK_KEYWORDS_RE.finditer(content.lower())}
         
         # Calculate basic scores
-        relevance = 0.8 if any(keyword in content_lower for keyword in disaster_keywords) else 0.3
-        urgency = 8 if any(keyword in content_lower for keyword in urgency_keywords) else 5
+        relevance = 0.8 if found & _DISASTER_KEYWORDS else 0.3
+        urgency = 8 if found & _URGENCY_KEYWORDS else 5
         
         # Determine incident type
-        incident_type = "other"
-        for dtype in ["flood", "fire", "earthquake", "storm"]:
-            if dtype in content_lower:
-                incident_type = dtype
-                break
+        incident_type = next((dtype for dtype in _INCIDENT_TYPE_KEYWORDS if dtype in found), "other")
         
         return {
             "relevance_score": relevance,
@@ -215,7 +344,7 @@ Scoring guidelines:
             "sentiment": {
                 "distress_level": "medium",
                 "emotions": ["concern"],
-                "help_seeking": "help" in content_lower
+                "help_seeking": "help" in found
             },
             "incident_type": incident_type,
             "severity": "moderate",
@@ -231,6 +360,21 @@ Scoring guidelines:
     async def generate_alert(self, incident_data: Dict[str, Any]) -> Dict[str, str]:
         """Generate alert message for incident"""
         try:
+            cache_key = self.cache.make_key("gemini-2.5-flash", {
+                "task": "alert",
+                "incident_type": incident_data.get('incident_type'),
+                "severity": incident_data.get('severity'),
+                "location": incident_data.get('locations', [{}])[0].get('name', 'Unknown'),
+                "urgency_score": incident_data.get('urgency_score'),
+                "key_details": incident_data.get('key_details')
+            })
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
+            if not self._allow_request():
+                return self._create_fallback_alert(incident_data)
+            
             prompt = f"""
 Generate an emergency alert message based on this incident:
 
@@ -251,29 +395,33 @@ Response format:
 }}
 """
             
-            # Use JSON mode for alert generation too
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    response_mime_type="application/json"
-                )
-            )
+            # Use structured JSON output for alert generation too
+            response = await self.model.generate_content_async(prompt, generation_config=self.alert_config)
+            self._record_success()
             
             if response and response.text:
                 try:
-                    return json.loads(response.text)
-                except json.JSONDecodeError:
+                    alert_messages = self._parse_json_response(response.text)
+                    self.cache.set(cache_key, alert_messages)
+                    return alert_messages
+                except orjson.JSONDecodeError:
                     pass
             
             # Fallback alert generation
-            return {
-                "public_message": f"{incident_data.get('severity', 'Moderate').title()} {incident_data.get('incident_type', 'incident')} reported in {incident_data.get('locations', [{}])[0].get('name', 'affected area')}. Follow local emergency guidelines.",
-                "emergency_message": f"Emergency Response: {incident_data.get('severity', 'moderate')} {incident_data.get('incident_type', 'incident')} - Urgency {incident_data.get('urgency_score', 5)}/10. Location: {incident_data.get('locations', [{}])[0].get('name', 'unknown')}. Details: {incident_data.get('key_details', 'See incident report')}"
-            }
+            return self._create_fallback_alert(incident_data)
             
         except Exception as e:
             logger.error(f"Alert generation failed: {e}")
+            if isinstance(e, _TRANSIENT_ERRORS):
+                self._record_failure()
             return {
                 "public_message": "Emergency situation reported. Please follow local emergency guidelines.",
                 "emergency_message": "Emergency alert generation failed. Manual review required."
-            }
\ No newline at end of file
+            }
+    
+    def _create_fallback_alert(self, incident_data: Dict[str, Any]) -> Dict[str, str]:
+        """Create template alert messages when Gemini is unavailable"""
+        return {
+            "public_message": f"{incident_data.get('severity', 'Moderate').title()} {incident_data.get('incident_type', 'incident')} reported in {incident_data.get('locations', [{}])[0].get('name', 'affected area')}. Follow local emergency guidelines.",
+            "emergency_message": f"Emergency Response: {incident_data.get('severity', 'moderate')} {incident_data.get('incident_type', 'incident')} - Urgency {incident_data.get('urgency_score', 5)}/10. Location: {incident_data.get('locations', [{}])[0].get('name', 'unknown')}. Details: {incident_data.get('key_details', 'See incident report')}"
+        }
\ No newline at end of file
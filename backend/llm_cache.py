@@ -0,0 +1,45 @@
+import copy
+import hashlib
+import orjson
+from typing import Dict, Any, Optional
+from cachetools import TTLCache
+
+class LLMCache:
+    """In-memory LRU/TTL cache for Gemini responses"""
+
+    def __init__(self, maxsize: int = 1024, ttl: int = 3600):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_name: str, payload: Dict[str, Any]) -> str:
+        """Build a stable cache key for a model and its inputs"""
+        raw = orjson.dumps({"model": model_name, "payload": payload}, default=str, option=orjson.OPT_SORT_KEYS)
+        return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached response, or None on miss"""
+        value = self._cache.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        # Callers mutate the returned dict, so never hand out the stored one
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store a response"""
+        self._cache[key] = copy.deepcopy(value)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Cache statistics for monitoring"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -40,6 +40,8 @@ class Location(BaseModel):
 
 # Sentiment analysis model
 class Sentiment(BaseModel):
+    model_config = ConfigDict(use_enum_values=True)
+    
     distress_level: DistressLevel
     emotions: List[str] = []
     help_seeking: bool = False
@@ -53,6 +55,8 @@ class IncidentCreate(BaseModel):
     image: Optional[str] = None
 
 class Incident(IncidentCreate):
+    model_config = ConfigDict(use_enum_values=True)
+    
     id: str
     content_id: str
     processed_at: datetime
@@ -107,11 +111,12 @@ class IncidentResponse(BaseModel):
     image: Optional[str]
     alert_generated: bool
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 # Alert models
 class AlertCreate(BaseModel):
+    model_config = ConfigDict(use_enum_values=True)
+    
     title: str
     message: str
     severity: IncidentSeverity
@@ -141,8 +146,7 @@ class AlertResponse(BaseModel):
     engagement_rate: Optional[float]
     incident_id: Optional[str]
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 # Analytics models
 class AnalyticsSummary(BaseModel):
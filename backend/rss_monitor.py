@@ -2,15 +2,39 @@ import asyncio
 import feedparser
 import hashlib
 import logging
-import time
+import re
 import random
+import uuid
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import httpx
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
 logger = logging.getLogger(__name__)
 
+# Keywords for the quick relevance check before full AI analysis
+_RELEVANCE_KEYWORDS = (
+    'emergency', 'disaster', 'flood', 'fire', 'earthquake', 'storm',
+    'hurricane', 'tornado', 'landslide', 'evacuation', 'rescue',
+    'alert', 'warning', 'urgent', 'crisis', 'damage', 'destroyed',
+    'casualties', 'injured', 'missing', 'shelter', 'relief',
+    'emergency services', 'first responders', 'fema', 'red cross'
+)
+_RELEVANCE_RE = re.compile("|".join(re.escape(keyword) for keyword in _RELEVANCE_KEYWORDS))
+
+# Image shown for each incident type
+_INCIDENT_IMAGES = {
+    'flood': 'https://images.unsplash.com/photo-1600336153113-d66c79de3e91',
+    'fire': 'https://images.unsplash.com/photo-1639369488374-561b5486177d',
+    'earthquake': 'https://images.unsplash.com/photo-1677233860259-ce1a8e0f8498',
+    'landslide': 'https://images.unsplash.com/photo-1608723724234-558f4b72d8f5',
+    'storm': 'https://images.unsplash.com/photo-1604275689235-fdc521556c16',
+    'other': 'https://images.unsplash.com/photo-1608723724423-6f60a2fc1a90'
+}
+_DEFAULT_INCIDENT_IMAGE = _INCIDENT_IMAGES['other']
+
 class RSSMonitor:
     """RSS Feed Monitor for Disaster Management"""
     
@@ -20,6 +44,18 @@ class RSSMonitor:
         self.is_running = False
         self.last_check_time = None
         self.total_processed = 0
+        self._feed_tasks: List[asyncio.Task] = []
+        
+        # Shared HTTP client so feed hosts reuse keep-alive connections
+        self.http = httpx.AsyncClient(
+            timeout=30.0,
+            http2=True,
+            headers={"User-Agent": "DisasterWatch/1.0"},
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40)
+        )
+        
+        # ETag / Last-Modified validators per feed URL for conditional GETs
+        self._feed_validators: Dict[str, Dict[str, str]] = {}
         
         # Default RSS feeds for disaster monitoring
         self.rss_feeds = [
@@ -50,25 +86,36 @@ class RSSMonitor:
         ]
     
     async def start_monitoring(self):
-        """Start RSS monitoring loop"""
+        """Start RSS monitoring loops, one per feed"""
         self.is_running = True
         logger.info("Starting RSS monitoring...")
         
+        self._feed_tasks = [
+            asyncio.create_task(self._monitor_feed(feed))
+            for feed in self.rss_feeds
+        ]
+        await asyncio.gather(*self._feed_tasks)
+    
+    async def _monitor_feed(self, feed_config: Dict[str, Any]):
+        """Poll a single feed at its own check interval"""
         while self.is_running:
             try:
-                await self.process_all_feeds()
+                await self.process_feed(feed_config)
                 self.last_check_time = datetime.now(timezone.utc)
                 
-                # Wait 5 minutes between full cycles
-                await asyncio.sleep(300)
+                await asyncio.sleep(feed_config.get('check_interval_minutes', 5) * 60)
                 
             except Exception as e:
-                logger.error(f"RSS monitoring error: {e}")
+                logger.error(f"RSS monitoring error for {feed_config['name']}: {e}")
                 await asyncio.sleep(60)  # Wait 1 minute on error
     
     async def stop_monitoring(self):
         """Stop RSS monitoring"""
         self.is_running = False
+        for task in self._feed_tasks:
+            task.cancel()
+        self._feed_tasks = []
+        await self.http.aclose()
         logger.info("RSS monitoring stopped")
     
     async def process_all_feeds(self):
@@ -92,200 +139,317 @@ class RSSMonitor:
         try:
             logger.info(f"Processing feed: {feed_config['name']}")
             
-            # Fetch RSS feed
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(feed_config['url'])
-                response.raise_for_status()
-                
-                # Parse RSS content
-                feed_data = feedparser.parse(response.text)
-                
-                if not feed_data.entries:
-                    logger.warning(f"No entries found in feed: {feed_config['name']}")
-                    return
-                
-                # Process each entry
-                processed_count = 0
-                for entry in feed_data.entries[:10]:  # Limit to 10 most recent
-                    try:
-                        if await self.process_entry(entry, feed_config):
-                            processed_count += 1
-                    except Exception as e:
-                        logger.error(f"Error processing entry: {e}")
-                
-                logger.info(f"Processed {processed_count} new entries from {feed_config['name']}")
-                self.total_processed += processed_count
-                
-        except Exception as e:
-            logger.error(f"Error processing feed {feed_config['name']}: {e}")
-    
-    async def process_entry(self, entry, feed_config: Dict[str, Any]) -> bool:
-        """Process individual RSS entry"""
-        try:
-            # Extract basic information
-            title = getattr(entry, 'title', '')
-            description = getattr(entry, 'description', '') or getattr(entry, 'summary', '')
-            content = f"{title}. {description}"
+            # Fetch RSS feed, skipping it entirely if unchanged since last poll
+            url = feed_config['url']
+            validators = self._feed_validators.get(url, {})
+            headers = {}
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
             
-            # Create unique content ID
-            content_id = hashlib.md5(content.encode()).hexdigest()
+            response = await self.http.get(url, headers=headers)
+            if response.status_code == 304:
+                logger.info(f"Feed not modified: {feed_config['name']}")
+                return
+            response.raise_for_status()
             
-            # Check if already processed
-            existing = await self.db.incidents.find_one({"content_id": content_id})
-            if existing:
-                return False
+            # Parse the raw bytes in a worker thread; parsing is CPU-bound and
+            # feedparser handles the encoding declared by the document itself
+            feed_data = await asyncio.to_thread(feedparser.parse, response.content)
             
-            # Get published date
-            pub_date = self._parse_date(getattr(entry, 'published', ''))
-            source_url = getattr(entry, 'link', '')
+            if not feed_data.entries:
+                logger.warning(f"No entries found in feed: {feed_config['name']}")
+                return
             
-            # Quick relevance check before full processing
-            if not self._is_potentially_relevant(content):
-                logger.debug(f"Skipping non-relevant content: {title[:50]}...")
-                return False
+            # Collect keyword-relevant entries, deduplicated within the feed
+            candidates = {}
+            for entry in feed_data.entries[:10]:  # Limit to 10 most recent
+                candidate = self._extract_entry(entry)
+                
+                # Quick relevance check before full processing
+                if not self._is_potentially_relevant(candidate['content']):
+                    logger.debug(f"Skipping non-relevant content: {candidate['title'][:50]}...")
+                    continue
+                
+                candidates.setdefault(candidate['content_id'], candidate)
             
-            logger.info(f"Analyzing new content: {title[:50]}...")
+            # Drop entries that were already processed in a single query
+            new_entries = await self._filter_unseen(list(candidates.values()))
             
-            # Analyze with Gemini
-            analysis = await self.gemini_agent.analyze_content(
-                content=content,
-                source=feed_config['name'],
-                timestamp=pub_date.isoformat()
+            # Analyze all new entries concurrently
+            analyses = await asyncio.gather(
+                *[
+                    self.gemini_agent.analyze_content(
+                        content=candidate['content'],
+                        source=feed_config['name'],
+                        timestamp=candidate['published_at'].isoformat()
+                    )
+                    for candidate in new_entries
+                ],
+                return_exceptions=True
             )
             
-            # Check if content is relevant enough to store
-            if analysis.get('relevance_score', 0) < 0.6:
-                logger.debug(f"Content relevance too low: {analysis.get('relevance_score')}")
-                return False
-            
-            # Create incident document
-            incident_data = {
-                "id": f"incident_{int(time.time())}_{random.randint(1000, 9999)}",
-                "content_id": content_id,
-                "content": content,
-                "source": feed_config['name'],
-                "published_at": pub_date,
-                "processed_at": datetime.now(timezone.utc),
-                "source_url": source_url,
+            incidents = []
+            for candidate, analysis in zip(new_entries, analyses):
+                if isinstance(analysis, Exception):
+                    logger.error(f"Error processing entry: {analysis}")
+                    continue
                 
-                # Analysis results
-                "relevance_score": analysis.get('relevance_score'),
-                "urgency_score": analysis.get('urgency_score'),
-                "credibility_score": analysis.get('credibility_score'),
-                "locations": analysis.get('locations', []),
-                "sentiment": analysis.get('sentiment', {}),
-                "incident_type": analysis.get('incident_type'),
-                "severity": analysis.get('severity'),
-                "affected_population": analysis.get('affected_population'),
+                # Check if content is relevant enough to store
+                if analysis.get('relevance_score', 0) < 0.6:
+                    logger.debug(f"Content relevance too low: {analysis.get('relevance_score')}")
+                    continue
                 
-                # Mock social media metrics
-                "likes": random.randint(5, 100),
-                "shares": random.randint(2, 50),
-                "comments": random.randint(1, 30),
-                
-                # Assign relevant image based on incident type
-                "image": self._get_incident_image(analysis.get('incident_type')),
-                
-                # Alert info
-                "alert_generated": False,
-                "alert_id": None,
-                
-                # Metadata
-                "processing_time_ms": analysis.get('processing_time_ms'),
-                "gemini_model": analysis.get('gemini_model')
-            }
+                incidents.append(self._build_incident(candidate, analysis, feed_config))
             
-            # Save to database
-            await self.db.incidents.insert_one(incident_data)
+            # Alert messages only need the analysis, so generate them for
+            # high urgency incidents while the incidents are being saved
+            urgent = [incident_data for incident_data in incidents if incident_data['urgency_score'] >= 8]
+            incidents, alert_messages = await asyncio.gather(
+                self._insert_incidents(incidents),
+                asyncio.gather(
+                    *[self.gemini_agent.generate_alert(incident_data) for incident_data in urgent],
+                    return_exceptions=True
+                )
+            )
             
-            # Generate alert for high urgency incidents
-            if incident_data['urgency_score'] >= 8:
-                await self._generate_alert_for_incident(incident_data)
+            # Store alerts for the incidents that were actually saved
+            stored_ids = {incident_data['id'] for incident_data in incidents}
+            await self._store_alerts([
+                (incident_data, messages)
+                for incident_data, messages in zip(urgent, alert_messages)
+                if incident_data['id'] in stored_ids
+            ])
             
-            logger.info(f"New incident stored: {incident_data['severity']} {incident_data['incident_type']} - Urgency: {incident_data['urgency_score']}/10")
-            return True
+            await self._update_stats(incidents)
             
+            for incident_data in incidents:
+                logger.info(f"New incident stored: {incident_data['severity']} {incident_data['incident_type']} - Urgency: {incident_data['urgency_score']}/10")
+            
+            logger.info(f"Processed {len(incidents)} new entries from {feed_config['name']}")
+            self.total_processed += len(incidents)
+            
+            # Only remember validators once the feed content has been handled
+            self._feed_validators[url] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')
+            }
+                
         except Exception as e:
-            logger.error(f"Error processing RSS entry: {e}")
-            return False
+            logger.error(f"Error processing feed {feed_config['name']}: {e}")
+    
+    def _extract_entry(self, entry) -> Dict[str, Any]:
+        """Extract the fields needed for analysis from an RSS entry"""
+        title = getattr(entry, 'title', '')
+        description = getattr(entry, 'description', '') or getattr(entry, 'summary', '')
+        content = f"{title}. {description}"
+        source_url = getattr(entry, 'link', '')
+        
+        # Create unique content ID; title and link identify an entry without
+        # hashing the whole description
+        identity = f"{title}|{source_url}" if source_url else content
+        
+        return {
+            "title": title,
+            "content": content,
+            "content_id": hashlib.md5(identity.encode('utf-8', 'ignore')).hexdigest(),
+            "published_at": self._parse_date(entry),
+            "source_url": source_url
+        }
+    
+    async def _filter_unseen(self, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return candidates whose content_id is not stored yet"""
+        if not candidates:
+            return []
+        
+        ids = [candidate['content_id'] for candidate in candidates]
+        cursor = self.db.incidents.find(
+            {"content_id": {"$in": ids}},
+            {"content_id": 1, "_id": 0}
+        )
+        seen = {doc['content_id'] async for doc in cursor}
+        
+        return [candidate for candidate in candidates if candidate['content_id'] not in seen]
     
-    def _parse_date(self, date_str: str) -> datetime:
-        """Parse RSS date string"""
+    async def _insert_incidents(self, incidents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert incidents and return the ones actually stored"""
+        if not incidents:
+            return []
+        
+        # Upsert on content_id so an incident another feed stored concurrently
+        # is skipped instead of failing the batch
+        operations = [
+            UpdateOne({"content_id": incident['content_id']}, {"$setOnInsert": incident}, upsert=True)
+            for incident in incidents
+        ]
+        
+        try:
+            result = await self.db.incidents.bulk_write(operations, ordered=False)
+            inserted = result.upserted_ids
+        except BulkWriteError as e:
+            for error in e.details.get('writeErrors', []):
+                if error.get('code') != 11000:
+                    logger.error(f"Failed to store incident: {error.get('errmsg')}")
+            inserted = {upsert['index']: upsert['_id'] for upsert in e.details.get('upserted', [])}
+        
+        return [incident for index, incident in enumerate(incidents) if index in inserted]
+    
+    async def _update_stats(self, incidents: List[Dict[str, Any]]):
+        """Add stored incidents to the counters behind /analytics/summary"""
+        if not incidents:
+            return
+        
+        increments = {
+            "total_incidents": len(incidents),
+            "critical_incidents": sum(1 for incident in incidents if incident['severity'] == 'critical'),
+            "sum_urgency": sum(incident['urgency_score'] for incident in incidents),
+            "count_urgency": len(incidents)
+        }
+        for incident in incidents:
+            day_key = f"daily_incidents.{incident['published_at']:%Y-%m-%d}"
+            increments[day_key] = increments.get(day_key, 0) + 1
+        
         try:
-            if date_str:
-                # Try parsing common RSS date formats
-                import email.utils
-                timestamp = email.utils.parsedate_tz(date_str)
-                if timestamp:
-                    return datetime.fromtimestamp(email.utils.mktime_tz(timestamp), tz=timezone.utc)
-        except:
-            pass
+            await self.db.stats.update_one({"_id": "global"}, {"$inc": increments}, upsert=True)
+        except Exception as e:
+            logger.error(f"Failed to update stats: {e}")
+    
+    def _build_incident(self, candidate: Dict[str, Any], analysis: Dict[str, Any], feed_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Create incident document from an entry and its analysis"""
+        return {
+            "id": f"incident_{uuid.uuid4().hex[:16]}",
+            "content_id": candidate['content_id'],
+            "content": candidate['content'],
+            "source": feed_config['name'],
+            "published_at": candidate['published_at'],
+            "processed_at": datetime.now(timezone.utc),
+            "source_url": candidate['source_url'],
+            
+            # Analysis results
+            "relevance_score": analysis.get('relevance_score'),
+            "urgency_score": analysis.get('urgency_score'),
+            "credibility_score": analysis.get('credibility_score'),
+            # Lowercased names let the location filter use an index
+            "locations": [
+                {**location, "name_lower": location['name'].lower()}
+                for location in analysis.get('locations', [])
+            ],
+            "sentiment": analysis.get('sentiment', {}),
+            "incident_type": analysis.get('incident_type'),
+            "severity": analysis.get('severity'),
+            "affected_population": analysis.get('affected_population'),
+            
+            # Mock social media metrics
+            "likes": random.randint(5, 100),
+            "shares": random.randint(2, 50),
+            "comments": random.randint(1, 30),
+            
+            # Assign relevant image based on incident type
+            "image": self._get_incident_image(analysis.get('incident_type')),
+            
+            # Alert info
+            "alert_generated": False,
+            "alert_id": None,
+            
+            # Metadata
+            "processing_time_ms": analysis.get('processing_time_ms'),
+            "gemini_model": analysis.get('gemini_model')
+        }
+    
+    def _parse_date(self, entry) -> datetime:
+        """Get the publication date feedparser already parsed (UTC)"""
+        parsed = getattr(entry, 'published_parsed', None) or getattr(entry, 'updated_parsed', None)
+        if parsed:
+            return datetime(*parsed[:6], tzinfo=timezone.utc)
         
         # Fallback to current time
         return datetime.now(timezone.utc)
     
     def _is_potentially_relevant(self, content: str) -> bool:
         """Quick relevance check before full AI analysis"""
-        disaster_keywords = [
-            'emergency', 'disaster', 'flood', 'fire', 'earthquake', 'storm',
-            'hurricane', 'tornado', 'landslide', 'evacuation', 'rescue',
-            'alert', 'warning', 'urgent', 'crisis', 'damage', 'destroyed',
-            'casualties', 'injured', 'missing', 'shelter', 'relief',
-            'emergency services', 'first responders', 'FEMA', 'red cross'
-        ]
-        
-        content_lower = content.lower()
-        return any(keyword in content_lower for keyword in disaster_keywords)
+        return _RELEVANCE_RE.search(content.lower()) is not None
     
     def _get_incident_image(self, incident_type: str) -> Optional[str]:
         """Get appropriate image URL for incident type"""
-        image_mapping = {
-            'flood': 'https://images.unsplash.com/photo-1600336153113-d66c79de3e91',
-            'fire': 'https://images.unsplash.com/photo-1639369488374-561b5486177d', 
-            'earthquake': 'https://images.unsplash.com/photo-1677233860259-ce1a8e0f8498',
-            'landslide': 'https://images.unsplash.com/photo-1608723724234-558f4b72d8f5',
-            'storm': 'https://images.unsplash.com/photo-1604275689235-fdc521556c16',
-            'other': 'https://images.unsplash.com/photo-1608723724423-6f60a2fc1a90'
-        }
-        
-        return image_mapping.get(incident_type, image_mapping['other'])
+        return _INCIDENT_IMAGES.get(incident_type, _DEFAULT_INCIDENT_IMAGE)
     
-    async def _generate_alert_for_incident(self, incident_data: Dict[str, Any]):
-        """Generate alert for high urgency incident"""
+    async def _store_alerts(self, generated: List[Tuple[Dict[str, Any], Any]]):
+        """Store alerts for incidents paired with their generated messages"""
+        if not generated:
+            return
+        
         try:
-            # Generate alert messages
-            alert_messages = await self.gemini_agent.generate_alert(incident_data)
+            alerts = []
+            incident_updates = []
+            for incident_data, alert_messages in generated:
+                if isinstance(alert_messages, Exception):
+                    logger.error(f"Failed to generate alert: {alert_messages}")
+                    continue
+                
+                alert_data = self._build_alert(incident_data, alert_messages)
+                alerts.append(alert_data)
+                
+                # Update incident with alert info
+                incident_updates.append(UpdateOne(
+                    {"id": incident_data['id']},
+                    {
+                        "$set": {
+                            "alert_generated": True,
+                            "alert_id": alert_data['id']
+                        }
+                    }
+                ))
             
-            # Create alert document
-            alert_data = {
-                "id": f"alert_{int(time.time())}_{random.randint(1000, 9999)}",
-                "incident_id": incident_data['id'],
-                "title": f"{incident_data['severity'].title()} {incident_data['incident_type'].title()} Alert",
-                "message": alert_messages.get('public_message', 'Emergency situation detected'),
-                "severity": incident_data['severity'],
-                "audience": ['public', 'emergency_services'],
-                "status": 'sent',
-                "created_at": datetime.now(timezone.utc),
-                "sent_at": datetime.now(timezone.utc),
-                "delivery_rate": random.uniform(85, 98),
-                "engagement_rate": random.uniform(60, 85)
-            }
+            if not alerts:
+                return
             
-            # Save alert
-            await self.db.alerts.insert_one(alert_data)
+            # Save alerts in one batched write
+            failed = set()
+            try:
+                result = await self.db.alerts.insert_many(alerts, ordered=False)
+                inserted = len(result.inserted_ids)
+            except BulkWriteError as e:
+                inserted = e.details.get('nInserted', 0)
+                logger.error(f"Failed to store {len(alerts) - inserted} alerts: {e.details.get('writeErrors')}")
+                failed = {error['index'] for error in e.details.get('writeErrors', [])}
             
-            # Update incident with alert info
-            await self.db.incidents.update_one(
-                {"id": incident_data['id']},
-                {
-                    "$set": {
-                        "alert_generated": True,
-                        "alert_id": alert_data['id']
-                    }
-                }
-            )
+            # Alerts are stored already sent, so they count as active. Count
+            # them now so a failed incident update cannot leave them out
+            if inserted:
+                try:
+                    await self.db.stats.update_one(
+                        {"_id": "global"}, {"$inc": {"active_alerts": inserted}}, upsert=True
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to update active alerts counter: {e}")
             
-            logger.info(f"Alert generated for incident: {incident_data['id']}")
+            # Only link incidents to alerts that were actually stored
+            stored = [index for index in range(len(alerts)) if index not in failed]
+            if not stored:
+                return
+            
+            # Link the alerts to their incidents in one batched write
+            await self.db.incidents.bulk_write([incident_updates[index] for index in stored], ordered=False)
+            
+            for index in stored:
+                logger.info(f"Alert generated for incident: {alerts[index]['incident_id']}")
             
         except Exception as e:
-            logger.error(f"Failed to generate alert: {e}")
+            logger.error(f"Failed to store alerts: {e}")
+    
+    def _build_alert(self, incident_data: Dict[str, Any], alert_messages: Dict[str, str]) -> Dict[str, Any]:
+        """Create alert document for an incident"""
+        return {
+            "id": f"alert_{uuid.uuid4().hex[:16]}",
+            "incident_id": incident_data['id'],
+            "title": f"{incident_data['severity'].title()} {incident_data['incident_type'].title()} Alert",
+            "message": alert_messages.get('public_message', 'Emergency situation detected'),
+            "severity": incident_data['severity'],
+            "audience": ['public', 'emergency_services'],
+            "status": 'sent',
+            "created_at": datetime.now(timezone.utc),
+            "sent_at": datetime.now(timezone.utc),
+            "delivery_rate": random.uniform(85, 98),
+            "engagement_rate": random.uniform(60, 85)
+        }
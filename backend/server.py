@@ -1,15 +1,23 @@
-from fastapi import FastAPI, APIRouter, HTTPException, BackgroundTasks
+from fastapi import FastAPI, APIRouter, HTTPException, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timezone
 from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
 import os
+import re
 import logging
+import time
+import secrets
 import json
 import hashlib
 import asyncio
+import orjson
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -19,7 +27,7 @@ from rss_monitor import RSSMonitor
 from models import (
     Incident, IncidentCreate, IncidentResponse,
     Alert, AlertCreate, AlertResponse,
-    AnalyticsSummary, LocationSummary
+    AnalyticsSummary, Location, LocationSummary
 )
 
 ROOT_DIR = Path(__file__).parent
@@ -31,8 +39,57 @@ DB_NAME = os.environ['DB_NAME']
 GEMINI_API_KEY = os.environ['GEMINI_API_KEY']
 CORS_ORIGINS = os.environ.get('CORS_ORIGINS', '*').split(',')
 
-# Initialize MongoDB
-client = AsyncIOMotorClient(MONGO_URL)
+# Stored documents are trusted, so read endpoints project the response
+# fields in Mongo and serialize with orjson instead of building models.
+# Locations are projected field by field to leave out internal name_lower
+INCIDENT_PROJECTION = {
+    "_id": 0,
+    **{field: 1 for field in IncidentResponse.model_fields if field != "locations"},
+    **{f"locations.{field}": 1 for field in Location.model_fields}
+}
+ALERT_PROJECTION = {"_id": 0, **{field: 1 for field in AlertResponse.model_fields}}
+
+# Fields read when building /incidents/by-bounds features
+BOUNDS_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "severity": 1,
+    "incident_type": 1,
+    "urgency_score": 1,
+    "content": {"$substrCP": [{"$ifNull": ["$content", ""]}, 0, 200]},
+    "locations": 1,
+    "published_at": 1,
+    "source": 1
+}
+
+# Alerts counted as active; stats.active_alerts tracks this count
+ACTIVE_ALERTS_QUERY = {"status": {"$in": ["sent", "sending"]}}
+
+# Serialized /incidents/map payloads. Keys include the RSS ingest count, so
+# newly stored incidents make older entries unreachable before they expire
+map_cache = TTLCache(maxsize=64, ttl=60)
+
+# /health timestamp, formatted at most once per second
+_last_ts_second = 0
+_last_iso = ""
+
+# Alert delivery: a fixed number of workers drain the queue, and blocking
+# provider calls run in a thread pool so they never stall the event loop
+ALERT_WORKERS = 4
+alert_queue: asyncio.Queue = asyncio.Queue()
+alert_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="alert-sender")
+
+# Initialize MongoDB with an explicit pool so bursts queue briefly and fail
+# fast instead of waiting indefinitely for a connection
+client = AsyncIOMotorClient(
+    MONGO_URL,
+    maxPoolSize=50,
+    minPoolSize=10,
+    maxIdleTimeMS=30000,
+    waitQueueTimeoutMS=2000,
+    serverSelectionTimeoutMS=3000,
+    compressors="zstd,zlib"
+)
 db = client[DB_NAME]
 
 # Initialize Gemini Agent
@@ -41,19 +98,182 @@ gemini_agent = GeminiAnalysisAgent(GEMINI_API_KEY)
 # Initialize RSS Monitor
 rss_monitor = RSSMonitor(db, gemini_agent)
 
+# Indexes used by ingestion and the API, as (collection, keys, options)
+INDEXES = [
+    # RSS ingestion relies on this to reject duplicate entries
+    ("incidents", "content_id", {"unique": True}),
+    # Incident listings sort by recency, optionally filtered
+    ("incidents", [("published_at", -1)], {}),
+    ("incidents", [("severity", 1), ("published_at", -1)], {}),
+    ("incidents", [("incident_type", 1), ("published_at", -1)], {}),
+    ("incidents", [("locations.name_lower", 1)], {}),
+    ("alerts", "id", {"unique": True}),
+    ("alerts", [("created_at", -1)], {}),
+    ("alerts", [("status", 1), ("created_at", -1)], {})
+]
+
+async def count_duplicates(collection, field: str) -> int:
+    """Count values of field shared by more than one document"""
+    pipeline = [
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        {"$match": {"_id": {"$ne": None}, "count": {"$gt": 1}}},
+        {"$count": "values"}
+    ]
+    result = await collection.aggregate(pipeline, allowDiskUse=True).to_list(length=1)
+    return result[0]["values"] if result else 0
+
+async def index_blocked_by_duplicates(name: str, keys) -> bool:
+    """Check whether legacy duplicates would make a unique index build fail"""
+    if not isinstance(keys, str):
+        return False
+    collection = db[name]
+    if f"{keys}_1" in await collection.index_information():
+        return False
+    duplicates = await count_duplicates(collection, keys)
+    if duplicates:
+        # Resolving these touches incident/alert links, so leave it to an explicit migration
+        logger.error(
+            f"Skipping unique index {name}.{keys}: {duplicates} values are shared by several "
+            f"documents and must be cleaned up before duplicates can be rejected"
+        )
+    return bool(duplicates)
+
+async def ensure_indexes():
+    """Create MongoDB indexes used by ingestion and the API"""
+    indexes = []
+    for name, keys, options in INDEXES:
+        if options.get("unique"):
+            try:
+                if await index_blocked_by_duplicates(name, keys):
+                    continue
+            except Exception as e:
+                logger.error(f"Failed to check {name}.{keys} for duplicates: {e}")
+        indexes.append((name, keys, options))
+    
+    # Build each index separately so one failure does not skip the rest
+    results = await asyncio.gather(
+        *(db[name].create_index(keys, **options) for name, keys, options in indexes),
+        return_exceptions=True
+    )
+    for (name, keys, options), result in zip(indexes, results):
+        if not isinstance(result, Exception):
+            continue
+        if options.get("unique"):
+            logger.error(f"Unique index {name}.{keys} is missing, so duplicates are not rejected: {result}")
+        else:
+            logger.error(f"Failed to create index {name}.{keys}: {result}")
+
+async def backfill_location_names():
+    """Add locations.name_lower to incidents stored before it existed"""
+    try:
+        cursor = db.incidents.find(
+            {"locations.name": {"$exists": True}, "locations.name_lower": {"$exists": False}},
+            {"locations": 1}
+        )
+        # Lowercase in Python like ingestion does; $toLower only handles ASCII
+        updates = [
+            UpdateOne(
+                {"_id": incident["_id"]},
+                {"$set": {"locations": [
+                    {**location, "name_lower": location["name"].lower()} if "name" in location else location
+                    for location in incident["locations"]
+                ]}}
+            )
+            async for incident in cursor
+        ]
+        if updates:
+            await db.incidents.bulk_write(updates, ordered=False)
+            logger.info(f"Added lowercased location names to {len(updates)} incidents")
+    except Exception as e:
+        logger.error(f"Failed to backfill location names: {e}")
+
+async def adjust_active_alerts(delta: int):
+    """Apply a change to the maintained active alerts counter"""
+    try:
+        await db.stats.update_one({"_id": "global"}, {"$inc": {"active_alerts": delta}}, upsert=True)
+    except Exception as e:
+        logger.error(f"Failed to update active alerts counter: {e}")
+
+async def ensure_stats():
+    """Backfill the incident counters document from existing incidents"""
+    try:
+        # Ingestion upserts the document too, so only the marker set by a
+        # completed backfill shows the counters cover older incidents
+        existing = await db.stats.find_one({"_id": "global"}, {"backfilled": 1})
+        if existing and existing.get("backfilled"):
+            return
+        
+        pipeline = [
+            {
+                "$group": {
+                    "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$published_at"}},
+                    "total_incidents": {"$sum": 1},
+                    "critical_incidents": {
+                        "$sum": {"$cond": [{"$eq": ["$severity", "critical"]}, 1, 0]}
+                    },
+                    "sum_urgency": {"$sum": "$urgency_score"},
+                    "count_urgency": {
+                        "$sum": {"$cond": [{"$isNumber": "$urgency_score"}, 1, 0]}
+                    }
+                }
+            }
+        ]
+        
+        stats = {
+            "total_incidents": 0,
+            "critical_incidents": 0,
+            "sum_urgency": 0,
+            "count_urgency": 0,
+            "daily_incidents": {}
+        }
+        async for day in db.incidents.aggregate(pipeline):
+            for field in ("total_incidents", "critical_incidents", "sum_urgency", "count_urgency"):
+                stats[field] += day[field]
+            if day["_id"]:
+                stats["daily_incidents"][day["_id"]] = day["total_incidents"]
+        
+        # The recount already includes anything ingestion added, so replace
+        # the counters instead of adding to them
+        await db.stats.update_one(
+            {"_id": "global"},
+            {"$set": {**stats, "backfilled": True}},
+            upsert=True
+        )
+        logger.info(f"Backfilled incident stats: {stats['total_incidents']} incidents")
+    except Exception as e:
+        logger.error(f"Failed to backfill stats: {e}")
+
+async def reconcile_active_alerts():
+    """Reset the active alerts counter from the alerts collection"""
+    try:
+        # Runs before alerts are sent or ingested, so it also clears any
+        # drift left by counter updates that failed in a previous run
+        active_alerts = await db.alerts.count_documents(ACTIVE_ALERTS_QUERY)
+        await db.stats.update_one({"_id": "global"}, {"$set": {"active_alerts": active_alerts}}, upsert=True)
+    except Exception as e:
+        logger.error(f"Failed to reconcile active alerts counter: {e}")
+
 # Lifespan context manager for startup/shutdown events
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifespan"""
     # Startup
     logger.info("Starting DisasterWatch API...")
+    await ensure_indexes()
+    await backfill_location_names()
+    await ensure_stats()
+    await reconcile_active_alerts()
     monitoring_task = asyncio.create_task(rss_monitor.start_monitoring())
     logger.info("RSS monitoring started")
+    alert_workers = [asyncio.create_task(alert_worker()) for _ in range(ALERT_WORKERS)]
     
     yield
     
     # Shutdown
     monitoring_task.cancel()
+    for worker in alert_workers:
+        worker.cancel()
+    alert_executor.shutdown(wait=False)
     await rss_monitor.stop_monitoring()
     client.close()
     logger.info("DisasterWatch API shutdown complete")
@@ -63,7 +283,8 @@ app = FastAPI(
     title="DisasterWatch API",
     description="Intelligent Tweet Analyzer for Disaster Management",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Create API router
@@ -78,6 +299,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Polled GET endpoints and the Cache-Control sent for each
+CACHEABLE_PATHS = {
+    # Health must stay fresh, so caches may not serve it stale
+    "/api/health": "public, max-age=1",
+    "/api/analytics/summary": "public, max-age=10, stale-while-revalidate=30",
+    "/api/monitoring/status": "public, max-age=10, stale-while-revalidate=30",
+    "/api/incidents/map": "public, max-age=10, stale-while-revalidate=30"
+}
+
+@app.middleware("http")
+async def add_cache_headers(request: Request, call_next):
+    """Add ETag/Cache-Control to polled endpoints and answer revalidations with 304"""
+    response = await call_next(request)
+    
+    cache_control = CACHEABLE_PATHS.get(request.url.path)
+    if request.method != "GET" or cache_control is None or response.status_code != 200:
+        return response
+    
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    headers = dict(response.headers)
+    headers["etag"] = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    headers["cache-control"] = cache_control
+    
+    if request.headers.get("if-none-match") == headers["etag"]:
+        headers.pop("content-length", None)
+        headers.pop("content-type", None)
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=body, status_code=response.status_code, headers=headers)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -85,35 +336,41 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Lifespan context manager for startup/shutdown events
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Manage application lifespan"""
-    # Startup
-    logger.info("Starting DisasterWatch API...")
-    monitoring_task = asyncio.create_task(rss_monitor.start_monitoring())
-    logger.info("RSS monitoring started")
-    
-    yield
-    
-    # Shutdown
-    monitoring_task.cancel()
-    await rss_monitor.stop_monitoring()
-    client.close()
-    logger.info("DisasterWatch API shutdown complete")
+async def stream_json_array(first, cursor):
+    """Yield an already fetched first document and the rest of a cursor as one JSON array"""
+    yield b"["
+    if first is None:
+        yield b"]"
+        return
+    yield orjson.dumps(first)
+    async for document in cursor:
+        yield b"," + orjson.dumps(document)
+    yield b"]"
 
 # Health check endpoint
 @api_router.get("/health")
 async def health_check():
     """Health check endpoint"""
+    global _last_ts_second, _last_iso
+    now = int(time.time())
+    if now != _last_ts_second:
+        _last_iso = datetime.fromtimestamp(now, timezone.utc).isoformat()
+        _last_ts_second = now
+    
+    topology = client.topology_description
     return {
         "status": "healthy",
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-        "version": "1.0.0"
+        "timestamp": _last_iso,
+        "version": "1.0.0",
+        "database": {
+            "topology": topology.topology_type_name,
+            "servers": len(topology.known_servers),
+            "max_pool_size": client.options.pool_options.max_pool_size
+        }
     }
 
 # Incident endpoints
-@api_router.get("/incidents", response_model=List[IncidentResponse])
+@api_router.get("/incidents")
 async def get_incidents(
     limit: int = 20,
     offset: int = 0,
@@ -130,21 +387,19 @@ async def get_incidents(
         if incident_type:
             query["incident_type"] = incident_type
         if location:
-            query["locations.name"] = {"$regex": location, "$options": "i"}
+            # Anchored prefix match on the lowercased name can use its index
+            query["locations.name_lower"] = {"$regex": f"^{re.escape(location.lower())}"}
         
         # Get incidents
-        incidents = await db.incidents.find(query)\
+        cursor = db.incidents.find(query, INCIDENT_PROJECTION)\
             .sort("published_at", -1)\
             .skip(offset)\
-            .limit(limit)\
-            .to_list(length=None)
-        
-        # Convert MongoDB ObjectId to string
-        for incident in incidents:
-            if '_id' in incident:
-                incident['_id'] = str(incident['_id'])
+            .limit(limit)
         
-        return [IncidentResponse(**incident) for incident in incidents]
+        # Run the query here so database errors still become a 500, then
+        # stream the rest as Mongo returns them instead of buffering the list
+        first = await anext(cursor, None)
+        return StreamingResponse(stream_json_array(first, cursor), media_type="application/json")
     
     except Exception as e:
         logger.error(f"Error fetching incidents: {e}")
@@ -157,6 +412,11 @@ async def get_incidents_for_map(
 ):
     """Get incidents formatted for map visualization"""
     try:
+        cache_key = (rss_monitor.total_processed, severity, incident_type)
+        cached = map_cache.get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+        
         # Build query
         query = {"locations": {"$exists": True, "$ne": []}}
         if severity:
@@ -164,36 +424,47 @@ async def get_incidents_for_map(
         if incident_type:
             query["incident_type"] = incident_type
         
-        incidents = await db.incidents.find(query)\
-            .sort("published_at", -1).limit(100).to_list(length=None)
+        # Let Mongo shape one GeoJSON feature per located incident
+        pipeline = [
+            {"$match": query},
+            {"$sort": {"published_at": -1}},
+            {"$limit": 100},
+            {"$unwind": "$locations"},
+            # Zero coordinates are placeholders for unknown positions
+            {"$match": {
+                "locations.latitude": {"$nin": [None, 0]},
+                "locations.longitude": {"$nin": [None, 0]}
+            }},
+            {"$project": {
+                "_id": 0,
+                "type": {"$literal": "Feature"},
+                "geometry": {
+                    "type": {"$literal": "Point"},
+                    "coordinates": ["$locations.longitude", "$locations.latitude"]
+                },
+                # $ifNull keeps missing fields as null instead of dropping them
+                "properties": {
+                    "incident_id": {"$ifNull": ["$id", None]},
+                    "severity": {"$ifNull": ["$severity", None]},
+                    "incident_type": {"$ifNull": ["$incident_type", None]},
+                    "urgency_score": {"$ifNull": ["$urgency_score", None]},
+                    "content": {"$substrCP": [{"$ifNull": ["$content", ""]}, 0, 200]},
+                    "location_name": {"$ifNull": ["$locations.name", None]},
+                    "published_at": {"$ifNull": ["$published_at", None]},
+                    "source": {"$ifNull": ["$source", None]}
+                }
+            }}
+        ]
         
-        # Format for GeoJSON
-        features = []
-        for incident in incidents:
-            for location in incident.get("locations", []):
-                if location.get("latitude") and location.get("longitude"):
-                    features.append({
-                        "type": "Feature",
-                        "geometry": {
-                            "type": "Point",
-                            "coordinates": [location["longitude"], location["latitude"]]
-                        },
-                        "properties": {
-                            "incident_id": incident["id"],
-                            "severity": incident.get("severity"),
-                            "incident_type": incident.get("incident_type"),
-                            "urgency_score": incident.get("urgency_score"),
-                            "content": incident.get("content", "")[:200],
-                            "location_name": location.get("name"),
-                            "published_at": incident.get("published_at").isoformat() if incident.get("published_at") else None,
-                            "source": incident.get("source")
-                        }
-                    })
+        features = await db.incidents.aggregate(pipeline).to_list(length=None)
         
-        return {
+        payload = orjson.dumps({
             "type": "FeatureCollection",
             "features": features
-        }
+        })
+        map_cache[cache_key] = payload
+        
+        return Response(content=payload, media_type="application/json")
     
     except Exception as e:
         logger.error(f"Error fetching map incidents: {e}")
@@ -227,7 +498,7 @@ async def get_incidents_by_bounds(
         if incident_type:
             query["incident_type"] = incident_type
         
-        incidents = await db.incidents.find(query)\
+        incidents = await db.incidents.find(query, BOUNDS_PROJECTION)\
             .sort("published_at", -1)\
             .limit(limit)\
             .to_list(length=None)
@@ -276,19 +547,15 @@ async def get_incidents_by_bounds(
         logger.error(f"Error fetching incidents by bounds: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch incidents by bounds")
 
-@api_router.get("/incidents/{incident_id}", response_model=IncidentResponse)
+@api_router.get("/incidents/{incident_id}")
 async def get_incident(incident_id: str):
     """Get specific incident by ID"""
     try:
-        incident = await db.incidents.find_one({"id": incident_id})
+        incident = await db.incidents.find_one({"id": incident_id}, INCIDENT_PROJECTION)
         if not incident:
             raise HTTPException(status_code=404, detail="Incident not found")
         
-        # Convert MongoDB ObjectId to string
-        if '_id' in incident:
-            incident['_id'] = str(incident['_id'])
-        
-        return IncidentResponse(**incident)
+        return ORJSONResponse(incident)
     
     except HTTPException:
         raise
@@ -297,48 +564,41 @@ async def get_incident(incident_id: str):
         raise HTTPException(status_code=500, detail="Failed to fetch incident")
 
 # Alert endpoints
-@api_router.get("/alerts", response_model=List[AlertResponse])
+@api_router.get("/alerts")
 async def get_alerts(limit: int = 20, offset: int = 0):
     """Get alerts"""
     try:
-        alerts = await db.alerts.find()\
+        alerts = await db.alerts.find({}, ALERT_PROJECTION)\
             .sort("created_at", -1)\
             .skip(offset)\
             .limit(limit)\
             .to_list(length=None)
         
-        # Convert MongoDB ObjectId to string
-        for alert in alerts:
-            if '_id' in alert:
-                alert['_id'] = str(alert['_id'])
-        
-        return [AlertResponse(**alert) for alert in alerts]
+        return ORJSONResponse(alerts)
     
     except Exception as e:
         logger.error(f"Error fetching alerts: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch alerts")
 
-@api_router.post("/alerts", response_model=AlertResponse)
-async def create_alert(
-    alert_data: AlertCreate,
-    background_tasks: BackgroundTasks
-):
+@api_router.post("/alerts")
+async def create_alert(alert_data: AlertCreate):
     """Create new alert"""
     try:
         # Create alert document
-        alert_dict = alert_data.dict()
-        alert_dict["id"] = f"alert_{int(datetime.now().timestamp())}"
+        alert_dict = alert_data.model_dump()
+        alert_dict["id"] = f"alert_{secrets.token_hex(8)}"
         alert_dict["created_at"] = datetime.now(timezone.utc)
         alert_dict["status"] = "draft"
         
         # Insert into database
         await db.alerts.insert_one(alert_dict)
         
-        # If auto_send is True, schedule sending
+        # If auto_send is True, queue it for the alert workers
         if alert_data.auto_send:
-            background_tasks.add_task(send_alert, alert_dict["id"])
+            alert_queue.put_nowait(alert_dict["id"])
         
-        return AlertResponse(**alert_dict)
+        # Same shape as /alerts; insert_one added the ObjectId under _id
+        return ORJSONResponse({field: alert_dict.get(field) for field in AlertResponse.model_fields})
     
     except Exception as e:
         logger.error(f"Error creating alert: {e}")
@@ -349,45 +609,33 @@ async def create_alert(
 async def get_analytics_summary():
     """Get analytics summary"""
     try:
-        # Calculate date ranges
-        now = datetime.now(timezone.utc)
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        # Aggregate statistics
-        pipeline = [
+        # Counters are maintained by RSS ingestion and alert sending instead
+        # of scanning incidents and alerts
+        today_key = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        # daily_incidents grows by one key per day; only today's is needed
+        stats = await db.stats.find_one(
+            {"_id": "global"},
             {
-                "$group": {
-                    "_id": None,
-                    "total_incidents": {"$sum": 1},
-                    "critical_incidents": {
-                        "$sum": {"$cond": [{"$eq": ["$severity", "critical"]}, 1, 0]}
-                    },
-                    "avg_urgency": {"$avg": "$urgency_score"},
-                    "today_incidents": {
-                        "$sum": {
-                            "$cond": [
-                                {"$gte": ["$published_at", today_start]}, 1, 0
-                            ]
-                        }
-                    }
-                }
+                "total_incidents": 1,
+                "critical_incidents": 1,
+                "active_alerts": 1,
+                "sum_urgency": 1,
+                "count_urgency": 1,
+                f"daily_incidents.{today_key}": 1
             }
-        ]
-        
-        result = await db.incidents.aggregate(pipeline).to_list(1)
-        stats = result[0] if result else {}
+        ) or {}
+        count_urgency = stats.get("count_urgency", 0)
+        avg_urgency = stats.get("sum_urgency", 0) / count_urgency if count_urgency else 0
         
-        # Count active alerts
-        active_alerts = await db.alerts.count_documents({"status": {"$in": ["sent", "sending"]}})
-        
-        return AnalyticsSummary(
-            total_incidents=stats.get("total_incidents", 0),
-            critical_incidents=stats.get("critical_incidents", 0),
-            active_alerts=active_alerts,
-            avg_urgency_score=round(stats.get("avg_urgency", 0), 1),
-            incidents_today=stats.get("today_incidents", 0),
-            resolution_rate=94.5  # Mock for now
-        )
+        # response_model documents the shape; the dict is encoded directly
+        return ORJSONResponse({
+            "total_incidents": stats.get("total_incidents", 0),
+            "critical_incidents": stats.get("critical_incidents", 0),
+            "active_alerts": stats.get("active_alerts", 0),
+            "avg_urgency_score": round(avg_urgency, 1),
+            "incidents_today": stats.get("daily_incidents", {}).get(today_key, 0),
+            "resolution_rate": 94.5  # Mock for now
+        })
     
     except Exception as e:
         logger.error(f"Error fetching analytics: {e}")
@@ -398,6 +646,7 @@ async def get_top_locations(limit: int = 10):
     """Get top affected locations"""
     try:
         pipeline = [
+            {"$match": {"locations": {"$exists": True, "$ne": []}}},
             {"$unwind": "$locations"},
             {
                 "$group": {
@@ -410,20 +659,21 @@ async def get_top_locations(limit: int = 10):
                 }
             },
             {"$sort": {"incident_count": -1}},
-            {"$limit": limit}
+            {"$limit": limit},
+            {
+                "$project": {
+                    "_id": 0,
+                    "location_name": "$_id",
+                    "incident_count": 1,
+                    "critical_count": 1,
+                    "avg_urgency_score": {"$round": ["$avg_urgency", 1]}
+                }
+            }
         ]
         
         results = await db.incidents.aggregate(pipeline).to_list(limit)
         
-        return [
-            LocationSummary(
-                location_name=result["_id"],
-                incident_count=result["incident_count"],
-                critical_count=result["critical_count"],
-                avg_urgency_score=round(result["avg_urgency"], 1)
-            )
-            for result in results
-        ]
+        return ORJSONResponse(results)
     
     except Exception as e:
         logger.error(f"Error fetching location analytics: {e}")
@@ -437,7 +687,9 @@ async def get_monitoring_status():
         "status": "active" if rss_monitor.is_running else "inactive",
         "feeds_count": len(rss_monitor.rss_feeds),
         "last_check": rss_monitor.last_check_time.isoformat() if rss_monitor.last_check_time else None,
-        "total_processed": getattr(rss_monitor, 'total_processed', 0)
+        "total_processed": getattr(rss_monitor, 'total_processed', 0),
+        "llm_cache": gemini_agent.cache.stats,
+        "gemini_degraded": gemini_agent.degraded
     }
 
 @api_router.post("/monitoring/process")
@@ -446,23 +698,47 @@ async def manual_process(background_tasks: BackgroundTasks):
     background_tasks.add_task(rss_monitor.process_all_feeds)
     return {"message": "Processing started"}
 
-# Helper function for sending alerts
+# Helper functions for sending alerts
+async def alert_worker():
+    """Send queued alerts one at a time"""
+    while True:
+        alert_id = await alert_queue.get()
+        try:
+            await send_alert(alert_id)
+        except Exception as e:
+            # Keep the worker alive if even the failure update errors
+            logger.error(f"Alert worker error for {alert_id}: {e}")
+        finally:
+            alert_queue.task_done()
+
+def deliver_alert(alert_id: str):
+    """Blocking delivery through the notification provider"""
+    # Simulate alert sending (replace with real implementation)
+    time.sleep(2)
+
 async def send_alert(alert_id: str):
-    """Background task to send alert"""
+    """Send alert and record its delivery status"""
+    loop = asyncio.get_running_loop()
     try:
-        # Update alert status
-        await db.alerts.update_one(
-            {"id": alert_id},
-            {
-                "$set": {
-                    "status": "sending",
-                    "sent_at": datetime.now(timezone.utc)
+        # Mark the alert as sending while delivery runs instead of before it.
+        # Both finish before the final write, so updates land in order
+        results = await asyncio.gather(
+            db.alerts.update_one(
+                {"id": alert_id},
+                {
+                    "$set": {
+                        "status": "sending",
+                        "sent_at": datetime.now(timezone.utc)
+                    }
                 }
-            }
+            ),
+            loop.run_in_executor(alert_executor, deliver_alert, alert_id),
+            adjust_active_alerts(1),
+            return_exceptions=True
         )
-        
-        # Simulate alert sending (replace with real implementation)
-        await asyncio.sleep(2)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
         
         # Mark as sent
         await db.alerts.update_one(
@@ -481,9 +757,12 @@ async def send_alert(alert_id: str):
     except Exception as e:
         logger.error(f"Failed to send alert {alert_id}: {e}")
         # Mark as failed
-        await db.alerts.update_one(
-            {"id": alert_id},
-            {"$set": {"status": "failed"}}
+        await asyncio.gather(
+            db.alerts.update_one(
+                {"id": alert_id},
+                {"$set": {"status": "failed"}}
+            ),
+            adjust_active_alerts(-1)
         )
 
 # Include router
@@ -491,4 +770,15 @@ app.include_router(api_router)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
+    # Single worker: the lifespan starts the RSS monitor and alert workers,
+    # which must not run once per process
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8001,
+        loop="uvloop",
+        http="httptools",
+        backlog=2048,
+        timeout_keep_alive=30,
+        access_log=False
+    )
\ No newline at end of file
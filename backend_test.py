@@ -4,48 +4,98 @@ DisasterWatch Backend API Testing Suite
 Tests the OpenStreetMap integration endpoints and existing functionality
 """
 
-import requests
+import asyncio
+import httpx
 import json
 import sys
+import time
 from datetime import datetime
+from types import MappingProxyType
+from operator import itemgetter
 from typing import Dict, Any, List
 
+# orjson decodes response bytes directly and much faster; fall back to json
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 # Configuration
 BACKEND_URL = "https://geo-alert-filter.preview.emergentagent.com/api"
 
+def make_prop_checker(field: str, expected: Any):
+    """Build a counter of features whose property field differs from expected"""
+    get_field = itemgetter(field)
+    
+    def check(features: List[Dict[str, Any]]) -> int:
+        return sum(1 for f in features if get_field(f["properties"]) != expected)
+    
+    return check
+
+# Filter validators shared by the map and by-bounds tests
+_count_non_critical = make_prop_checker("severity", "critical")
+_count_non_fire = make_prop_checker("incident_type", "fire")
+
 class DisasterWatchTester:
+    # Endpoint paths, joined to base_url at request time
+    _URL_HEALTH = "/health"
+    _URL_INCIDENTS = "/incidents"
+    _URL_MAP = "/incidents/map"
+    _URL_BOUNDS = "/incidents/by-bounds"
+    _URL_SUMMARY = "/analytics/summary"
+    
+    # New York area bounds shared by the by-bounds tests
+    _BOUNDS_NE = MappingProxyType({"north": 45.0, "south": 40.0, "east": -70.0, "west": -75.0})
+    
     def __init__(self):
         self.base_url = BACKEND_URL
         self.test_results = []
-        self.session = requests.Session()
-        self.session.timeout = 30
+        # One HTTP/2 client multiplexes the concurrent requests from every
+        # test over a single connection to the API host
+        self.client = httpx.AsyncClient(
+            http2=True,
+            timeout=30,
+            limits=httpx.Limits(max_keepalive_connections=8)
+        )
         
     def log_test(self, test_name: str, success: bool, details: str = "", response_data: Any = None):
         """Log test result"""
+        # Keep only a bounded snippet of failing responses, not whole payloads
+        snippet = repr(response_data)[:4096] if not success and response_data else None
         result = {
             "test": test_name,
             "success": success,
             "details": details,
-            "timestamp": datetime.now().isoformat(),
-            "response_data": response_data
+            # Formatted only when the summary prints it
+            "timestamp": time.time_ns(),
+            "response_data": snippet
         }
-        self.test_results.append(result)
-        
         status = "✅ PASS" if success else "❌ FAIL"
+        
+        self.test_results.append(result)
         print(f"{status} {test_name}")
         if details:
             print(f"   Details: {details}")
-        if not success and response_data:
-            print(f"   Response: {response_data}")
+        if snippet:
+            print(f"   Response: {snippet}")
         print()
 
-    def test_health_endpoint(self):
+    def _json(self, response) -> Any:
+        """Decode a JSON response body"""
+        return _loads(response.content)
+
+    async def _get_all(self, reqs: List[tuple]) -> List[httpx.Response]:
+        """Issue independent GETs concurrently, returning responses in request order"""
+        return await asyncio.gather(*(self.client.get(url, params=params) for url, params in reqs))
+
+    async def test_health_endpoint(self):
         """Test health check endpoint"""
         try:
-            response = self.session.get(f"{self.base_url}/health")
+            response = await self.client.get(self.base_url + self._URL_HEALTH)
             
             if response.status_code == 200:
-                data = response.json()
+                data = self._json(response)
                 if "status" in data and "timestamp" in data and "version" in data:
                     self.log_test("Health Check", True, f"Status: {data['status']}, Version: {data['version']}")
                 else:
@@ -56,13 +106,13 @@ class DisasterWatchTester:
         except Exception as e:
             self.log_test("Health Check", False, f"Exception: {str(e)}")
 
-    def test_incidents_endpoint(self):
+    async def test_incidents_endpoint(self):
         """Test basic incidents endpoint"""
         try:
-            response = self.session.get(f"{self.base_url}/incidents?limit=10")
+            response = await self.client.get(self.base_url + self._URL_INCIDENTS, params={"limit": 10})
             
             if response.status_code == 200:
-                data = response.json()
+                data = self._json(response)
                 if isinstance(data, list):
                     self.log_test("Basic Incidents Endpoint", True, f"Retrieved {len(data)} incidents")
                     
@@ -83,14 +133,14 @@ class DisasterWatchTester:
         except Exception as e:
             self.log_test("Basic Incidents Endpoint", False, f"Exception: {str(e)}")
 
-    def test_incidents_map_endpoint(self):
+    async def test_incidents_map_endpoint(self):
         """Test enhanced /api/incidents/map endpoint"""
         try:
             # Test basic map endpoint
-            response = self.session.get(f"{self.base_url}/incidents/map")
+            response = await self.client.get(self.base_url + self._URL_MAP)
             
             if response.status_code == 200:
-                data = response.json()
+                data = self._json(response)
                 
                 # Check GeoJSON structure
                 if data.get("type") == "FeatureCollection" and "features" in data:
@@ -131,23 +181,28 @@ class DisasterWatchTester:
         except Exception as e:
             self.log_test("Map Endpoint - Basic", False, f"Exception: {str(e)}")
 
-    def test_incidents_map_with_filters(self):
+    async def test_incidents_map_with_filters(self):
         """Test map endpoint with severity and type filters"""
         try:
-            # Test with severity filter
-            response = self.session.get(f"{self.base_url}/incidents/map?severity=critical")
+            # Severity and type filters are independent, so request both at once
+            severity_response, type_response = await self._get_all([
+                (self.base_url + self._URL_MAP, {"severity": "critical"}),
+                (self.base_url + self._URL_MAP, {"incident_type": "fire"})
+            ])
             
+            # Test with severity filter
+            response = severity_response
             if response.status_code == 200:
-                data = response.json()
+                data = self._json(response)
                 if data.get("type") == "FeatureCollection":
                     features = data["features"]
                     self.log_test("Map Endpoint - Severity Filter", True, f"Retrieved {len(features)} critical incidents")
                     
                     # Verify all features have critical severity
                     if features:
-                        non_critical = [f for f in features if f.get("properties", {}).get("severity") != "critical"]
+                        non_critical = _count_non_critical(features)
                         if non_critical:
-                            self.log_test("Severity Filter Validation", False, f"Found {len(non_critical)} non-critical incidents")
+                            self.log_test("Severity Filter Validation", False, f"Found {non_critical} non-critical incidents")
                         else:
                             self.log_test("Severity Filter Validation", True, "All incidents have critical severity")
                 else:
@@ -156,19 +211,18 @@ class DisasterWatchTester:
                 self.log_test("Map Endpoint - Severity Filter", False, f"HTTP {response.status_code}", response.text)
 
             # Test with incident type filter
-            response = self.session.get(f"{self.base_url}/incidents/map?incident_type=fire")
-            
+            response = type_response
             if response.status_code == 200:
-                data = response.json()
+                data = self._json(response)
                 if data.get("type") == "FeatureCollection":
                     features = data["features"]
                     self.log_test("Map Endpoint - Type Filter", True, f"Retrieved {len(features)} fire incidents")
                     
                     # Verify all features have fire type
                     if features:
-                        non_fire = [f for f in features if f.get("properties", {}).get("incident_type") != "fire"]
+                        non_fire = _count_non_fire(features)
                         if non_fire:
-                            self.log_test("Type Filter Validation", False, f"Found {len(non_fire)} non-fire incidents")
+                            self.log_test("Type Filter Validation", False, f"Found {non_fire} non-fire incidents")
                         else:
                             self.log_test("Type Filter Validation", True, "All incidents are fire type")
                 else:
@@ -179,21 +233,14 @@ class DisasterWatchTester:
         except Exception as e:
             self.log_test("Map Endpoint - Filters", False, f"Exception: {str(e)}")
 
-    def test_incidents_by_bounds_endpoint(self):
+    async def test_incidents_by_bounds_endpoint(self):
         """Test new /api/incidents/by-bounds endpoint"""
         try:
             # Test basic bounds query (New York area)
-            params = {
-                "north": 45.0,
-                "south": 40.0,
-                "east": -70.0,
-                "west": -75.0
-            }
-            
-            response = self.session.get(f"{self.base_url}/incidents/by-bounds", params=params)
+            response = await self.client.get(self.base_url + self._URL_BOUNDS, params=self._BOUNDS_NE)
             
             if response.status_code == 200:
-                data = response.json()
+                data = self._json(response)
                 
                 # Check GeoJSON structure
                 if data.get("type") == "FeatureCollection" and "features" in data and "bounds" in data:
@@ -203,7 +250,7 @@ class DisasterWatchTester:
                     self.log_test("By-Bounds Endpoint - Basic", True, f"Retrieved {len(features)} incidents within bounds")
                     
                     # Verify bounds info
-                    expected_bounds = {"north": 45.0, "south": 40.0, "east": -70.0, "west": -75.0}
+                    expected_bounds = dict(self._BOUNDS_NE)
                     if bounds == expected_bounds:
                         self.log_test("Bounds Info Validation", True, "Bounds info matches request")
                     else:
@@ -211,16 +258,13 @@ class DisasterWatchTester:
                     
                     # Verify coordinates are within bounds
                     if features:
-                        out_of_bounds = []
-                        for feature in features:
-                            coords = feature.get("geometry", {}).get("coordinates", [])
-                            if len(coords) == 2:
-                                lng, lat = coords
-                                if not (40.0 <= lat <= 45.0 and -75.0 <= lng <= -70.0):
-                                    out_of_bounds.append(coords)
+                        out_of_bounds = sum(
+                            1 for coords in (feature.get("geometry", {}).get("coordinates", []) for feature in features)
+                            if len(coords) == 2 and not (40.0 <= coords[1] <= 45.0 and -75.0 <= coords[0] <= -70.0)
+                        )
                         
                         if out_of_bounds:
-                            self.log_test("Bounds Filtering Validation", False, f"Found {len(out_of_bounds)} incidents outside bounds")
+                            self.log_test("Bounds Filtering Validation", False, f"Found {out_of_bounds} incidents outside bounds")
                         else:
                             self.log_test("Bounds Filtering Validation", True, "All incidents within specified bounds")
                 else:
@@ -231,31 +275,30 @@ class DisasterWatchTester:
         except Exception as e:
             self.log_test("By-Bounds Endpoint - Basic", False, f"Exception: {str(e)}")
 
-    def test_incidents_by_bounds_with_filters(self):
+    async def test_incidents_by_bounds_with_filters(self):
         """Test by-bounds endpoint with additional filters"""
         try:
-            # Test with severity filter
-            params = {
-                "north": 45.0,
-                "south": 40.0,
-                "east": -70.0,
-                "west": -75.0,
-                "severity": "critical"
-            }
-            
-            response = self.session.get(f"{self.base_url}/incidents/by-bounds", params=params)
+            # The three filter queries are independent, so request them at once
+            url = self.base_url + self._URL_BOUNDS
+            severity_response, type_response, combined_response = await self._get_all([
+                (url, {**self._BOUNDS_NE, "severity": "critical"}),
+                (url, {**self._BOUNDS_NE, "incident_type": "fire"}),
+                (url, {**self._BOUNDS_NE, "severity": "critical", "incident_type": "fire"})
+            ])
             
+            # Test with severity filter
+            response = severity_response
             if response.status_code == 200:
-                data = response.json()
+                data = self._json(response)
                 if data.get("type") == "FeatureCollection":
                     features = data["features"]
                     self.log_test("By-Bounds + Severity Filter", True, f"Retrieved {len(features)} critical incidents in bounds")
                     
                     # Verify all are critical
                     if features:
-                        non_critical = [f for f in features if f.get("properties", {}).get("severity") != "critical"]
+                        non_critical = _count_non_critical(features)
                         if non_critical:
-                            self.log_test("By-Bounds Severity Validation", False, f"Found {len(non_critical)} non-critical incidents")
+                            self.log_test("By-Bounds Severity Validation", False, f"Found {non_critical} non-critical incidents")
                         else:
                             self.log_test("By-Bounds Severity Validation", True, "All incidents are critical")
                 else:
@@ -264,27 +307,18 @@ class DisasterWatchTester:
                 self.log_test("By-Bounds + Severity Filter", False, f"HTTP {response.status_code}", response.text)
 
             # Test with incident type filter
-            params = {
-                "north": 45.0,
-                "south": 40.0,
-                "east": -70.0,
-                "west": -75.0,
-                "incident_type": "fire"
-            }
-            
-            response = self.session.get(f"{self.base_url}/incidents/by-bounds", params=params)
-            
+            response = type_response
             if response.status_code == 200:
-                data = response.json()
+                data = self._json(response)
                 if data.get("type") == "FeatureCollection":
                     features = data["features"]
                     self.log_test("By-Bounds + Type Filter", True, f"Retrieved {len(features)} fire incidents in bounds")
                     
                     # Verify all are fire type
                     if features:
-                        non_fire = [f for f in features if f.get("properties", {}).get("incident_type") != "fire"]
+                        non_fire = _count_non_fire(features)
                         if non_fire:
-                            self.log_test("By-Bounds Type Validation", False, f"Found {len(non_fire)} non-fire incidents")
+                            self.log_test("By-Bounds Type Validation", False, f"Found {non_fire} non-fire incidents")
                         else:
                             self.log_test("By-Bounds Type Validation", True, "All incidents are fire type")
                 else:
@@ -293,19 +327,9 @@ class DisasterWatchTester:
                 self.log_test("By-Bounds + Type Filter", False, f"HTTP {response.status_code}", response.text)
 
             # Test with combined filters
-            params = {
-                "north": 45.0,
-                "south": 40.0,
-                "east": -70.0,
-                "west": -75.0,
-                "severity": "critical",
-                "incident_type": "fire"
-            }
-            
-            response = self.session.get(f"{self.base_url}/incidents/by-bounds", params=params)
-            
+            response = combined_response
             if response.status_code == 200:
-                data = response.json()
+                data = self._json(response)
                 if data.get("type") == "FeatureCollection":
                     features = data["features"]
                     self.log_test("By-Bounds + Combined Filters", True, f"Retrieved {len(features)} critical fire incidents in bounds")
@@ -317,13 +341,13 @@ class DisasterWatchTester:
         except Exception as e:
             self.log_test("By-Bounds Endpoint - Filters", False, f"Exception: {str(e)}")
 
-    def test_analytics_summary_endpoint(self):
+    async def test_analytics_summary_endpoint(self):
         """Test analytics summary endpoint"""
         try:
-            response = self.session.get(f"{self.base_url}/analytics/summary")
+            response = await self.client.get(self.base_url + self._URL_SUMMARY)
             
             if response.status_code == 200:
-                data = response.json()
+                data = self._json(response)
                 required_fields = ["total_incidents", "critical_incidents", "active_alerts", "avg_urgency_score", "incidents_today", "resolution_rate"]
                 missing_fields = [field for field in required_fields if field not in data]
                 
@@ -337,10 +361,10 @@ class DisasterWatchTester:
         except Exception as e:
             self.log_test("Analytics Summary", False, f"Exception: {str(e)}")
 
-    def test_edge_cases(self):
+    async def test_edge_cases(self):
         """Test edge cases and error handling"""
         try:
-            # Test invalid bounds (south > north)
+            # Invalid bounds (south > north)
             params = {
                 "north": 40.0,
                 "south": 45.0,
@@ -348,11 +372,15 @@ class DisasterWatchTester:
                 "west": -75.0
             }
             
-            response = self.session.get(f"{self.base_url}/incidents/by-bounds", params=params)
+            # Invalid bounds and missing parameters, requested at once
+            url = self.base_url + self._URL_BOUNDS
+            invalid_response, missing_response = await self._get_all([(url, params), (url, None)])
             
+            # Test invalid bounds
+            response = invalid_response
             # Should either handle gracefully or return empty results
             if response.status_code == 200:
-                data = response.json()
+                data = self._json(response)
                 if data.get("type") == "FeatureCollection":
                     self.log_test("Invalid Bounds Handling", True, f"Handled invalid bounds gracefully, returned {len(data.get('features', []))} features")
                 else:
@@ -361,8 +389,7 @@ class DisasterWatchTester:
                 self.log_test("Invalid Bounds Handling", True, f"Properly rejected invalid bounds with HTTP {response.status_code}")
 
             # Test missing required parameters
-            response = self.session.get(f"{self.base_url}/incidents/by-bounds")
-            
+            response = missing_response
             if response.status_code == 422:  # FastAPI validation error
                 self.log_test("Missing Parameters Handling", True, "Properly rejected missing required parameters")
             else:
@@ -371,21 +398,23 @@ class DisasterWatchTester:
         except Exception as e:
             self.log_test("Edge Cases", False, f"Exception: {str(e)}")
 
-    def run_all_tests(self):
+    async def run_all_tests(self):
         """Run all tests"""
         print(f"🚀 Starting DisasterWatch Backend API Tests")
         print(f"Backend URL: {self.base_url}")
         print("=" * 60)
         
-        # Run tests in order
-        self.test_health_endpoint()
-        self.test_incidents_endpoint()
-        self.test_incidents_map_endpoint()
-        self.test_incidents_map_with_filters()
-        self.test_incidents_by_bounds_endpoint()
-        self.test_incidents_by_bounds_with_filters()
-        self.test_analytics_summary_endpoint()
-        self.test_edge_cases()
+        # Tests are independent and network-bound, so run them concurrently
+        await asyncio.gather(
+            self.test_health_endpoint(),
+            self.test_incidents_endpoint(),
+            self.test_incidents_map_endpoint(),
+            self.test_incidents_map_with_filters(),
+            self.test_incidents_by_bounds_endpoint(),
+            self.test_incidents_by_bounds_with_filters(),
+            self.test_analytics_summary_endpoint(),
+            self.test_edge_cases()
+        )
         
         # Summary
         print("=" * 60)
@@ -405,11 +434,19 @@ class DisasterWatchTester:
         if failed_tests:
             print("\n❌ FAILED TESTS:")
             for test in failed_tests:
-                print(f"  - {test['test']}: {test['details']}")
+                logged_at = datetime.fromtimestamp(test["timestamp"] / 1e9).isoformat(timespec="milliseconds")
+                print(f"  - [{logged_at}] {test['test']}: {test['details']}")
         
         return passed == total
 
-if __name__ == "__main__":
+async def main() -> bool:
+    """Run the suite and close the HTTP client"""
     tester = DisasterWatchTester()
-    success = tester.run_all_tests()
+    try:
+        return await tester.run_all_tests()
+    finally:
+        await tester.client.aclose()
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
     sys.exit(0 if success else 1)
\ No newline at end of file